@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8, vim: expandtab:ts=4 -*-
 
+import atexit
 import re
 import sys
 from argparse import Namespace
@@ -16,8 +17,11 @@ class CorpusConverterNewspaper:  # Mimic CorpusConverter
     def __init__(self, settings):
         self._logger = Namespace(log=print)  # Hack to be able to monkeypatch logger
 
-        # Set output_file handle
-        self._file_out = open(settings['output_corpus'], 'a+', encoding='UTF-8')
+        # Set output_file handle (unbuffered: the encoded articles are collected in _out_buf and written in chunks)
+        self._file_out = open(settings['output_corpus'], 'ab', buffering=0)
+        self._out_buf = bytearray()
+        self._flush_threshold = 4 << 20  # 4 MiB
+        atexit.register(self._flush)  # Write out the last, partially filled buffer at exit
 
         # This is useful to ingnore unwanted URLs by regex
         known_columns = yaml.safe_load(open('known_columns.yaml', encoding='UTF-8'))
@@ -63,8 +67,10 @@ class CorpusConverterNewspaper:  # Mimic CorpusConverter
         html_title = '<html-title> {0} </html-title>'.format(article.title)
         html_body = '<html-body>\n{0} </html-body>\n'.format(article.text)
 
-        print('<html_article>', html_date, html_description_lead, html_charset, html_url, html_keywords, html_title,
-              html_body, '</html_article>', sep='\n', end='', file=self._file_out)
+        self._out_buf += '\n'.join(('<html_article>', html_date, html_description_lead, html_charset, html_url,
+                                     html_keywords, html_title, html_body, '</html_article>')).encode('UTF-8')
+        if len(self._out_buf) > self._flush_threshold:
+            self._flush()
         self._logger.log('INFO', url, 'Article extraction OK', sep='\t', file=sys.stderr)
 
     @staticmethod
@@ -72,8 +78,17 @@ class CorpusConverterNewspaper:  # Mimic CorpusConverter
         _ = url, article_raw_html, scheme  # Silence dummy IDE
         return set()
 
+    def _flush(self):
+        if len(self._out_buf) > 0 and not self._file_out.closed:
+            with memoryview(self._out_buf) as view:  # Unbuffered raw writes may be partial
+                written = 0
+                while written < len(view):
+                    written += self._file_out.write(view[written:])
+            self._out_buf.clear()
+
     def __del__(self):
         if hasattr(self, '_file_out') and self._file_out is not None:
+            self._flush()
             self._file_out.close()
 
 
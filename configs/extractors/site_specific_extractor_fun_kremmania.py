@@ -3,7 +3,7 @@
 
 from os.path import abspath, dirname, join as os_path_join
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from webarticlecurator import WarcCachingDownloader, Logger
 
@@ -65,7 +65,7 @@ def extract_article_urls_from_page_kremmania_forum(archive_page_raw_html):
     """extracts and returns as a list the URLs belonging to articles from an HTML code
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs"""
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('span'))
     main_container = soup.find_all('span', class_='link-top-line')
     urls = {link for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
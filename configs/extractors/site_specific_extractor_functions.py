@@ -3,7 +3,7 @@
 
 from os.path import abspath, dirname, join as os_path_join
 import json
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 
 # BEGIN SITE SPECIFIC extract_next_page_url FUNCTIONS ##################################################################
@@ -271,7 +271,7 @@ def extract_article_urls_from_page_index(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('article'))
     main_container = soup.find_all('article')
     urls = {link for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -283,7 +283,7 @@ def extract_article_urls_from_page_mno(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h2'))
     main_container = soup.find_all('h2')
     urls = {link for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -327,7 +327,7 @@ def extract_article_urls_from_page_abcug(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h2'))
     main_container = soup.find_all('h2', class_='post-lead')
     urls = {link for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -339,7 +339,7 @@ def extract_article_urls_from_page_magyaridok(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h2'))
     main_container = soup.find_all('h2')
     urls = {link for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -377,7 +377,7 @@ def extract_article_urls_from_page_gov_koronavirus(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h3'))
     main_container = soup.find_all('h3', class_='tagtitle')
     urls = {f'https://www.nnk.gov.hu{link}' for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -389,7 +389,7 @@ def extract_article_urls_from_page_telex(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('div'))
     main_container = soup.find_all('div', class_='article')
     urls = {f'https://telex.hu{link}' for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -3,7 +3,7 @@
 
 from os.path import abspath, dirname, join as os_path_join
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from webarticlecurator import WarcCachingDownloader, Logger
 
@@ -64,7 +64,7 @@ def extract_article_urls_from_page_epiteszforum(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('div'))
     main_container = soup.find_all('div', class_='title')
     urls = {f'https://epiteszforum.hu{link}' for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
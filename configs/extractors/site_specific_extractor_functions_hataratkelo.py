@@ -4,10 +4,12 @@
 import re
 from os.path import abspath, dirname, join as os_path_join
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from webarticlecurator import WarcCachingDownloader, Logger
 
+token_param_re = re.compile('token=[0-9-a-f]+&?')  # Compiled once, used for every archive page
+
 
 # BEGIN SITE SPECIFIC extract_next_page_url FUNCTIONS ##################################################################
 
@@ -22,7 +24,7 @@ def extract_next_page_url_hataratkelo(archive_page_raw_html):
     if next_page_div is not None:
         next_page = next_page_div.find('a', {'href': True})
         if next_page is not None and next_page.has_attr('href'):
-            ret = re.sub('token=[0-9-a-f]+&?', '', next_page.attrs['href'])  # Remove token parameter!
+            ret = token_param_re.sub('', next_page.attrs['href'])  # Remove token parameter!
     return ret
 
 
@@ -60,7 +62,7 @@ def extract_article_urls_from_page_hataratkelo(archive_page_raw_html):
     """extracts and returns as a list the URLs belonging to articles from an HTML code
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs"""
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h2'))
     main_container = soup.find_all('h2')
     urls = {link for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -3,7 +3,7 @@
 
 from os.path import abspath, dirname, join as os_path_join
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from webarticlecurator import WarcCachingDownloader, Logger
 
@@ -228,7 +228,7 @@ def extract_article_urls_from_page_maszol(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h2'))
     main_container = soup.select('h2')
     urls = {link for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -332,7 +332,7 @@ def extract_article_urls_from_page_transindex(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('a'))
     main_container = soup.find_all('a', class_='archivumcim')
     urls = {extract_article_urls_from_page_transindex_QUIRKY_URLS.get(link['href'], link['href'])
             for link in main_container if 'href' in link.attrs}
@@ -360,7 +360,7 @@ def extract_article_urls_from_page_plakatmagany_transindex(archive_page_raw_html
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h2'))
     main_container = soup.find_all('h2', class_='entry-title archiveTitle h1')
     urls = {link for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -389,7 +389,7 @@ def extract_article_urls_from_page_tv_transindex(archive_page_raw_html):
     :return: list that contains URLs
     """
     urls = set()
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('section'))
     main_container = soup.find_all('section', class_='video-list')
     if len(main_container) > 0:
         # The second of the two identical horizontal scrolling boxes contain the column's articles.
@@ -4,7 +4,7 @@
 import json
 from os.path import abspath, dirname, join as os_path_join
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 
 from webarticlecurator import WarcCachingDownloader, Logger
 
@@ -234,7 +234,7 @@ def extract_article_urls_from_page_alfahir(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h2'))
     main_container = soup.find_all('h2')
     urls = {f'https://alfahir.hu{link}' for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
@@ -310,7 +310,7 @@ def extract_article_urls_from_page_magyarnarancs(archive_page_raw_html):
     :param archive_page_raw_html: archive page containing list of articles with their URLs
     :return: list that contains URLs
     """
-    soup = BeautifulSoup(archive_page_raw_html, 'lxml')
+    soup = BeautifulSoup(archive_page_raw_html, 'lxml', parse_only=SoupStrainer('h3'))
     main_container = soup.find_all('h3', class_='card-title')
     urls = {f'https://magyarnarancs.hu{link}' for link in safe_extract_hrefs_from_a_tags(main_container)}
     return urls
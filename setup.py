@@ -26,7 +26,7 @@ setuptools.setup(
     ],
     python_requires='>=3.6',
     install_requires=['pyyaml', 'chardet', 'requests', 'urllib3', 'warcio', 'ratelimit', 'beautifulsoup4', 'yamale',
-                      'newspaper3k'],  # Newspaper3k is optional!
+                      'xxhash', 'newspaper3k'],  # Newspaper3k is optional!
     include_package_data=True,
     entry_points={
         'console_scripts': [
@@ -6,6 +6,7 @@
 import os
 import sys
 from io import BytesIO
+from threading import Lock, RLock, local
 from collections import Counter
 
 from warcio.warcwriter import WARCWriter
@@ -22,6 +23,20 @@ from chardet import detect
 from ratelimit import limits, sleep_and_retry
 
 respv_str = {10: '1.0', 11: '1.1'}
+NOT_MODIFIED = object()  # Returned by WarcDownloader.download_url() on HTTP 304 for conditional requests
+
+
+def new_rate_limiter(max_no_of_calls_in_period=2, limit_period=1):
+    """
+        Create a function which blocks until the next call is allowed in the period (thread-safe)
+         to be able to share the same rate limit between multiple downloaders
+    """
+    @sleep_and_retry
+    @limits(calls=max_no_of_calls_in_period, period=limit_period)
+    def rate_limiter():
+        pass
+
+    return rate_limiter
 
 
 class WarcCachingDownloader:
@@ -36,6 +51,7 @@ class WarcCachingDownloader:
     """
     def __init__(self, existing_warc_filenames, new_warc_filename, _logger, just_cache=False, download_params=None):
         self._logger = _logger
+        self._lock = Lock()
         if download_params is not None:
             strict_mode = download_params.pop('strict_mode', False)
             check_digest = download_params.pop('check_digest', False)
@@ -62,37 +78,59 @@ class WarcCachingDownloader:
             self._new_downloads = WarcDownloader(new_warc_filename, _logger, info_record_data, **download_params)
 
     def download_url(self, url, ignore_cache=False):
-        # 1) Check if the URL is explicitly marked as bad...
-        if url in self._new_downloads.bad_urls:
-            self._logger.log('WARNING', url, 'Skipping URL explicitly marked as bad!', sep='\t')
-            return None
-        # 2) If the URL is present in the newly created WARC file warn and skip the URL!
-        elif url in self._new_downloads.good_urls:
-            # 3) throw error and return None!
-            self._logger.log('ERROR', 'Not processing URL, because it is already present in the WARC archive:', url)
-            return None
-        # 3) Check if the URL presents in the cached_content...
-        elif url in self.url_index:
-            # 3a) ...copy it! (from the last source WARC where the URL is found in)
-            cache, reqv, resp = self.get_records(url)
-            self._new_downloads.write_record(reqv, url)
-            self._new_downloads.write_record(resp, url)
-            # 3b) Get content even if the URL is a duplicate, because ignore_cache knows better what to do with it
-            cached_content = cache.download_url(url)
-        else:
-            cached_content = None
-
-        # 4) If we have the URL cached...
-        if cached_content is not None:
-            if not ignore_cache:
-                # 4a) and we do not explicitly ignore the cache, return the cached content!
-                return cached_content
-            else:
-                # 4b) Log that we ignored the cached_content and do noting!
+        # The source WARC streams and the target WARC are shared when called from multiple threads
+        with self._lock:
+            # 1) Check if the URL is explicitly marked as bad...
+            if url in self._new_downloads.bad_urls:
+                self._logger.log('WARNING', url, 'Skipping URL explicitly marked as bad!', sep='\t')
+                return None
+            # 2) If the URL is present in the newly created WARC file warn and skip the URL!
+            elif url in self._new_downloads.good_urls:
+                # 3) throw error and return None!
+                self._logger.log('ERROR', 'Not processing URL, because it is already present in the WARC archive:',
+                                 url)
+                return None
+            # 3) Check if the URL presents in the cached_content...
+            elif url in self.url_index:
+                if not ignore_cache:
+                    # 3a) and we do not explicitly ignore the cache, copy it and return the cached content!
+                    return self._copy_cached_records(url)
+                # 3b) Log that we ignored the cached_content, but download it only if it has been modified since!
                 self._logger.log('INFO', 'Ignoring cached_content for URL:', url)
+                cond_headers = self._get_conditional_headers(url)
+            else:
+                cond_headers = None
+
+        # 4) Really download the URL! (url not in cached_content or cached_content is ignored)
+        text = self._new_downloads.download_url(url, cond_headers)  # Still check if the URL is already downloaded!
+        if text is NOT_MODIFIED:
+            # 5) The cached content is still valid (HTTP 304), copy it instead!
+            with self._lock:
+                if url in self._new_downloads.good_urls:  # An other thread copied the same URL in the meantime
+                    self._logger.log('ERROR', 'Not processing URL, because it is already present in the WARC archive:',
+                                     url)
+                    return None
+                self._logger.log('INFO', 'Not modified, using cached_content for URL:', url)
+                return self._copy_cached_records(url)
+        return text
 
-        # 5) Really download the URL! (url not in cached_content or cached_content is ignored)
-        return self._new_downloads.download_url(url)  # Still check if the URL is already downloaded!
+    def _copy_cached_records(self, url):  # The lock must be held by the caller
+        # Copy the records from the last source WARC where the URL is found in and get the content
+        cache, reqv, resp = self.get_records(url)
+        self._new_downloads.write_records(reqv, resp, url)
+        return cache.download_url(url)
+
+    def _get_conditional_headers(self, url):  # The lock must be held by the caller
+        # Use the validators of the cached response to download the URL only if it has been modified since
+        _, _, resp = self.get_records(url)
+        cond_headers = {}
+        etag = resp.http_headers.get_header('ETag')
+        if etag is not None:
+            cond_headers['If-None-Match'] = etag
+        last_modified = resp.http_headers.get_header('Last-Modified')
+        if last_modified is not None:
+            cond_headers['If-Modified-Since'] = last_modified
+        return cond_headers
 
     def get_records(self, url):
         for cache in reversed(self._cached_downloads):
@@ -108,6 +146,10 @@ class WarcCachingDownloader:
     def bad_urls(self):  # Ready-only property for shortcut
         return self._new_downloads.bad_urls
 
+    @property
+    def rate_limiter(self):  # Ready-only property for shortcut
+        return self._new_downloads.rate_limiter
+
     @property
     def good_urls(self):  # Ready-only property for shortcut
         return self._new_downloads.good_urls
@@ -120,13 +162,14 @@ class WarcDummyDownloader:
     def __init__(self, *_, **__):
         self.bad_urls = set()
         self.good_urls = set()
+        self.rate_limiter = None  # No download, no rate limit
 
     @staticmethod
-    def download_url(_):
+    def download_url(*_):
         return None
 
     @staticmethod
-    def write_record(*_):
+    def write_records(*_):
         return None
 
 
@@ -137,12 +180,13 @@ class WarcDownloader:
     def __init__(self, expected_filename, _logger, warcinfo_record_data=None, program_name='WebArticleCurator',
                  user_agent=None, overwrite_warc=True, err_threshold=10, known_bad_urls=None,
                  max_no_of_calls_in_period=2, limit_period=1, proxy_url=None, allow_cookies=False, verify_request=True,
-                 stay_offline=False):
+                 stay_offline=False, rate_limiter=None):
         # Store variables
         self._logger = _logger
         self._req_headers = {'Accept-Encoding': 'identity', 'User-agent': user_agent}
         self._error_count = 0
         self._error_threshold = err_threshold  # Set the error threshold which cause aborting to prevent denial
+        self._lock = RLock()  # Downloading can run in parallel, but the bookkeeping and the WARC writing can not
 
         # Setup download function
         if not stay_offline:
@@ -151,8 +195,8 @@ class WarcDownloader:
             self.download_url = self._dummy_download_url
 
         if known_bad_urls is not None:  # Setup the list of cached bad URLs to prevent trying to download them again
-            with open(known_bad_urls, encoding='UTF-8') as fh:
-                self.bad_urls = {line.strip() for line in fh}
+            with open(known_bad_urls, encoding='UTF-8') as fh:  # Read at once and split without empty lines
+                self.bad_urls = set(filter(None, map(str.strip, fh.read().splitlines())))
         else:
             self.bad_urls = set()
 
@@ -163,19 +207,21 @@ class WarcDownloader:
         self._logger.log('INFO', 'Creating archivefile:', filename)
         self._output_file = open(filename, 'wb')
 
-        self._session = Session()  # Setup session for speeding up downloads
-        if proxy_url is not None:  # Set socks proxy if provided
-            self._session.proxies['http'] = proxy_url
-            self._session.proxies['https'] = proxy_url
+        # Setup sessions for speeding up downloads: one per thread as Session (and its cookie jar) is not thread-safe
+        self._proxy_url = proxy_url
+        self._thread_local = local()
+        self._shared_cookies = None  # The cookie jar is shared between the threads if cookies are allowed
 
         self._allow_cookies = allow_cookies
         self._verify_request = verify_request
         if not self._verify_request:
             disable_warnings(InsecureRequestWarning)
 
-        # Setup rate limiting to prevent hammering the server
-        self._requests_get = sleep_and_retry(limits(calls=max_no_of_calls_in_period,
-                                                    period=limit_period)(self._http_get_w_cookie_handling))
+        # Setup rate limiting to prevent hammering the server (a rate limiter shared with other downloaders can be
+        #  supplied, then max_no_of_calls_in_period and limit_period are ignored)
+        if rate_limiter is None:
+            rate_limiter = new_rate_limiter(max_no_of_calls_in_period, limit_period)
+        self.rate_limiter = rate_limiter
 
         self._writer = WARCWriter(self._output_file, gzip=True, warc_version='WARC/1.1')
         if warcinfo_record_data is None:  # Or use the parsed else custom headers will not be copied
@@ -205,19 +251,44 @@ class WarcDownloader:
         if hasattr(self, '_output_file'):  # If the program opened a file, then it should gracefully close it on exit!
             self._output_file.close()
 
+    def _requests_get(self, *args, **kwargs):
+        self.rate_limiter()  # Wait until the request is allowed
+        return self._http_get_w_cookie_handling(*args, **kwargs)
+
     def _http_get_w_cookie_handling(self, *args, **kwargs):
         """
             Extend requests.get with optional cookie purging
         """
+        session = self._get_session()
         if not self._allow_cookies:
-            self._session.cookies.clear()
-        return self._session.get(*args, **kwargs)
+            session.cookies.clear()
+        return session.get(*args, **kwargs)
+
+    def _get_session(self):
+        """
+            Get the session of the current thread or create it
+        """
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = Session()
+            if self._proxy_url is not None:  # Set socks proxy if provided
+                session.proxies['http'] = self._proxy_url
+                session.proxies['https'] = self._proxy_url
+            if self._allow_cookies:  # CookieJar locks internally, the sessions can share it
+                with self._lock:
+                    if self._shared_cookies is None:
+                        self._shared_cookies = session.cookies
+                session.cookies = self._shared_cookies
+            self._thread_local.session = session
+        return session
 
     def _handle_request_exception(self, url, msg):
         self._logger.log('WARNING', url, msg, sep='\t')
 
-        self._error_count += 1
-        if self._error_count >= self._error_threshold:
+        with self._lock:
+            self._error_count += 1
+            error_count = self._error_count
+        if error_count >= self._error_threshold:
             raise NameError('Too many error happened! Threshold exceeded! See log for details!')
 
     @staticmethod
@@ -238,10 +309,16 @@ class WarcDownloader:
                 peer_name = 'None'  # Socket closed and could not determine peername...
         return peer_name
 
-    def _dummy_download_url(self, _):
+    def _dummy_download_url(self, *_):
         raise NotImplementedError
 
-    def _download_url(self, url):
+    def _download_url(self, url, cond_headers=None):
+        """
+            Download the URL and write it to the WARC file
+            :param url: The URL
+            :param cond_headers: Extra headers for conditional requests (If-None-Match, If-Modified-Since)
+            :return: The decoded text, None if the download failed or NOT_MODIFIED (HTTP 304 for conditional requests)
+        """
         if url in self.bad_urls:
             self._logger.log('DEBUG', 'Not downloading known bad URL:', url)
             return None
@@ -250,19 +327,48 @@ class WarcDownloader:
             self._logger.log('ERROR', 'Not downloading URL, because it is already downloaded in this session:', url)
             return None
 
+        records_and_text = self._fetch(url, cond_headers)
+        if records_and_text is None or records_and_text is NOT_MODIFIED:
+            return records_and_text
+        reqv_record, resp_record, text = records_and_text
+
+        with self._lock:
+            if url in self.good_urls:  # An other thread downloaded the same URL in the meantime
+                self._logger.log('ERROR', 'Not writing URL, because it is already downloaded in this session:', url)
+                return None
+            # Everything is OK, write the two WARC records
+            self.write_records(reqv_record, resp_record, url)
+
+        return text
+
+    def _fetch(self, url, cond_headers=None):
+        """
+            Download the URL and create the request-response WARC record pair without writing them
+             (only the network I/O, which is safe to run parallel from multiple threads)
+            :return: (reqv_record, resp_record, decoded text), None if the download failed
+             or NOT_MODIFIED if the conditional request returned HTTP 304
+        """
+        req_headers = self._req_headers
+        if cond_headers is not None and len(cond_headers) > 0:
+            req_headers = {**req_headers, **cond_headers}
+
         scheme, netloc, path, params, query, fragment = urlparse(url)
         # For safety urlencode the generated URL... (The URL might be modified in this step.)
         path = quote(path, safe='/%')
         url_reparsed = urlunparse((scheme, netloc, path, params, query, fragment))
 
         try:  # The actual request (on the reparsed URL, everything else is made on the original URL)
-            resp = self._requests_get(url_reparsed, headers=self._req_headers, stream=True, verify=self._verify_request)
+            resp = self._requests_get(url_reparsed, headers=req_headers, stream=True, verify=self._verify_request)
         # UnicodeError is originated from idna codec error, LocationParseError is originated from URLlib3 error
         except (UnicodeError, RequestException, LocationParseError) as err:
             self._handle_request_exception(url, 'RequestException happened during downloading: {0} \n\n'
                                                 ' The program ignores it and jumps to the next one.'.format(err))
             return None
 
+        if resp.status_code == 304 and req_headers is not self._req_headers:  # Not Modified (no content)
+            resp.close()
+            return NOT_MODIFIED
+
         if resp.status_code != 200:  # Not HTTP 200 OK
             self._handle_request_exception(url, 'Downloading failed with status code: {0} {1}'.format(resp.status_code,
                                                                                                       resp.reason))
@@ -317,15 +423,15 @@ class WarcDownloader:
                                                       http_headers=resp_http_headers,
                                                       warc_headers_dict={'WARC-IP-Address': peer_name,
                                                                          'WARC-X-Detected-Encoding': enc})
-        # Everything is OK, write the two WARC records
-        self.write_record(reqv_record, url)
-        self.write_record(resp_record, url)
 
-        return text
+        return reqv_record, resp_record, text
 
-    def write_record(self, record, url):
-        self.good_urls.add(url)
-        self._writer.write_record(record)
+    def write_records(self, reqv_record, resp_record, url):
+        # The request-response pair must not be split by records of other threads (see WarcReader._create_index())
+        with self._lock:
+            self.good_urls.add(url)
+            self._writer.write_record(reqv_record)
+            self._writer.write_record(resp_record)
 
 
 class WarcReader:
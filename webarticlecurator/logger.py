@@ -16,6 +16,7 @@ class Logger:
         # logging.basicConfig(level=logging.INFO)  # For debugging requests
         log_levels = {'DEBUG': logging.DEBUG, 'INFO': logging.INFO, 'WARNING': logging.WARNING, 'ERROR': logging.ERROR,
                       'CRITICAL': logging.CRITICAL}
+        self._log_levels = log_levels
 
         if console_level not in log_levels:
             raise KeyError('Console loglevel is not valid ({0}): {1}'.format(', '.join(log_levels.keys()),
@@ -72,6 +73,9 @@ class Logger:
                 :return: None
         """
         _ = file  # Silence IDE
+        level_num = self._log_levels.get(level)
+        if level_num is not None and not self._logger.isEnabledFor(level_num):
+            return  # The message would be filtered anyway: do not build it
         for handler in self._logger.handlers:
             handler.terminator = end
         if level not in self._leveled_logger:
@@ -1,26 +1,81 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8, vim: expandtab:ts=4 -*-
 
+import atexit
+from queue import Queue, Full
+from threading import Thread, Event
 from datetime import timedelta
 from calendar import monthrange, isleap
+from concurrent.futures import ThreadPoolExecutor
 
 from webarticlecurator import WarcCachingDownloader, Logger
+from webarticlecurator.url_set import new_url_set, canonical_url, FrozenUrlHashSet
 
 
-def add_and_write_factory(attr, fname):
-    """A helper function to write gathered URLs to a file handle if it is supplied"""
+def add_and_write_factory(seen_urls, fname):
+    """
+        A helper function to add gathered URLs to the common set of the seen URLs (in canonical form) if it is supplied
+         and to write them to a file handle if it is supplied
+    """
+    def add(elem):
+        if seen_urls is not None:
+            seen_urls.add(canonical_url(elem))
+
     if fname is None:
-        return None, attr.add
+        return None, add
     else:
-        fh = open(fname, 'w', encoding='UTF-8')  # To store FH (for closing it)
+        fh = open(fname, 'wb')  # To store FH (for closing it). Binary: the URLs are encoded without a text layer
+        atexit.register(fh.close)  # The crawler may be never collected, flush the buffered URLs at exit anyway
 
         def add_fun(elem):
-            attr.add(elem)
-            print(elem, file=fh, flush=True)
+            add(elem)
+            fh.write(f'{elem}\n'.encode('UTF-8'))  # Buffered, flushed in chunks and on close
 
         return fh, add_fun
 
 
+def prefetch_iterator(it, maxsize=1024):
+    """
+        Run the iterator in a separate thread and yield its elements through a bounded queue
+         (e.g. the archive pages are downloaded and processed while the articles of the previous ones are processed)
+        Exceptions of the iterator are re-raised in the consumer
+    """
+    q = Queue(maxsize=maxsize)
+    stop = Event()  # Set when the consumer stopped early
+    done = object()  # Sentinel
+    error = []
+
+    def put(elem):
+        while not stop.is_set():
+            try:
+                q.put(elem, timeout=1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for elem in it:
+                if not put(elem):
+                    return
+        except BaseException as e:
+            error.append(e)
+        put(done)
+
+    Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            elem = q.get()
+            if elem is done:
+                break
+            yield elem
+        if len(error) > 0:
+            raise error[0]
+    finally:
+        stop.set()
+
+
 class NewsArchiveCrawler:
     """
         Using the provided regexes
@@ -28,11 +83,12 @@ class NewsArchiveCrawler:
         2) Extracts URLs of articles from these lists (with helper functions and config)
     """
     def __init__(self, settings, existing_archive_filenames, new_archive_filename, archive_just_cache=False,
-                 known_article_urls=None, debug_params=None, downloader_params=None):
+                 known_article_urls=None, debug_params=None, downloader_params=None, seen_urls=None):
 
         # List the used properties
         self._archive_page_urls_by_date = None
         self._archive_url_format = None
+        self._archive_url_template = None
         self._date_from = None
         self._date_until = None
         self._go_reverse_in_archive = None
@@ -53,23 +109,22 @@ class NewsArchiveCrawler:
             debug_params = {}
         self._logger = Logger(settings['log_file_archive'], **debug_params)
 
-        # Open files for writing gathered URLs if needed,
-        self.good_urls = set()
+        # Open files for writing gathered URLs if needed and add them to the seen URLs of the article crawler if any
         self._new_good_archive_urls_fh, self._good_urls_add = \
-            add_and_write_factory(self.good_urls, settings.get('new_good_archive_urls'))
+            add_and_write_factory(seen_urls, settings.get('new_good_archive_urls'))
 
-        self.problematic_urls = set()
         self._new_problematic_archive_urls_fh, self._problematic_urls_add = \
-            add_and_write_factory(self.problematic_urls, settings.get('new_problematic_archive_urls'))
-
-        # Setup the list of cached article URLs to stop archive crawling in time
-        self.known_article_urls = set()
-        if known_article_urls is not None:
-            if isinstance(known_article_urls, str):
-                with open(known_article_urls, encoding='UTF-8') as fh:
-                    self.known_article_urls = {line.strip() for line in fh}
-            elif isinstance(known_article_urls, set):
-                self.known_article_urls = known_article_urls
+            add_and_write_factory(seen_urls, settings.get('new_problematic_archive_urls'))
+
+        # Setup the list of cached article URLs to stop archive crawling in time (read-only during crawling)
+        if isinstance(known_article_urls, str):
+            with open(known_article_urls, encoding='UTF-8') as fh:  # Read at once and split without empty lines
+                self.known_article_urls = FrozenUrlHashSet(filter(None, map(str.strip, fh.read().splitlines())),
+                                                           canonical=True)
+        elif isinstance(known_article_urls, set):
+            self.known_article_urls = known_article_urls
+        else:
+            self.known_article_urls = FrozenUrlHashSet()
 
         # Create new archive while downloading, or simulate download and read the archive
         self._downloader = WarcCachingDownloader(existing_archive_filenames, new_archive_filename, self._logger,
@@ -79,11 +134,15 @@ class NewsArchiveCrawler:
         # Known good URLs (read-only, available at __init__ time from cache)
         self.url_index = self._downloader.url_index
 
+        # Download the first page of the next archive page URL while the current one is processed (one-deep prefetch)
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=1)
+
     def _store_settings(self, column_spec_settings):
         # Settings for URL iterator
         self._archive_page_urls_by_date = self._settings['archive_page_urls_by_date']
         self._archive_url_format = column_spec_settings['archive_url_format']
         if self._archive_page_urls_by_date:
+            self._archive_url_template = self._gen_url_template(self._archive_url_format)
             self._date_from = column_spec_settings['DATE_FROM']
             self._date_until = column_spec_settings['DATE_UNTIL']
             self._go_reverse_in_archive = self._settings['go_reverse_in_archive']
@@ -103,12 +162,15 @@ class NewsArchiveCrawler:
                                              self._settings['new_article_url_threshold'], self.known_article_urls)
 
     def __del__(self):  # Write newly found URLs to files when output files supplied...
+        if hasattr(self, '_prefetch_pool'):
+            self._prefetch_pool.shutdown()
+
         # Save the good URLs...
 
-        if hasattr(self, '_new_good_archive_urls_fh') and hasattr(self, 'close'):
+        if hasattr(self, '_new_good_archive_urls_fh') and self._new_good_archive_urls_fh is not None:
             self._new_good_archive_urls_fh.close()
 
-        if hasattr(self, '_new_problematic_archive_urls_fh') and hasattr(self, 'close'):
+        if hasattr(self, '_new_problematic_archive_urls_fh') and self._new_problematic_archive_urls_fh is not None:
             self._new_problematic_archive_urls_fh.close()
 
     def url_iterator(self):
@@ -127,22 +189,71 @@ class NewsArchiveCrawler:
             self._store_settings(params)
             # 2) By date with optional pagination (that is handled separately)
             if self._archive_page_urls_by_date:
-                # a) Unique the generated archive page URLs using every day from date_from to the end of date_until
-                archive_page_urls = list(set(self._gen_url_from_date(self._date_from + timedelta(days=curr_day),
-                                                                     self._archive_url_format)
-                                             for curr_day in range((self._date_until - self._date_from).days + 1)))
+                # a) Unique the generated archive page URLs using every day (month or year) from date_from
+                #     to the end of date_until
                 # b) Sort the generated archive page URLs
-                archive_page_urls.sort(reverse=self._go_reverse_in_archive)
+                archive_page_urls = sorted({self._gen_url_from_date(curr_date, self._archive_url_format,
+                                                                    self._archive_url_template)
+                                            for curr_date in self._gen_dates(self._date_from, self._date_until,
+                                                                             self._archive_url_format)},
+                                           reverse=self._go_reverse_in_archive)
             # 3) Stored in groups represented by pagination only which will be handled separately
             else:
                 archive_page_urls = [self._archive_url_format]  # Only the base URL is added
 
             # 4) Iterate the archive URLs and process them, while generating the required page URLs on demand
-            for archive_page_url in archive_page_urls:
-                yield from self._gen_article_urls_including_subpages(archive_page_url)
+            #  The first page of the next archive URL is already downloading while the current one is processed
+            #  (the URLs of the next pages of the current archive URL depend on the extracted article URLs)
+            first_page_future = None
+            for i, archive_page_url in enumerate(archive_page_urls):
+                curr_first_page_future = first_page_future
+                first_page_future = None
+                if i + 1 < len(archive_page_urls):
+                    first_page_future = self._prefetch_pool.submit(self._downloader.download_url,
+                                                                   self._first_page_url(archive_page_urls[i + 1]),
+                                                                   self._ignore_archive_cache)
+                yield from self._gen_article_urls_including_subpages(archive_page_url, curr_first_page_future)
+
+    @staticmethod
+    def _gen_dates(date_from, date_until, url_format):
+        """
+            Generates the dates from date_from to date_until (inclusive)
+             stepping by the smallest unit used in url_format
+             (e.g. if there is no day in the URL, the first date of every month or year generates all URLs)
+        """
+        by_day = '#day' in url_format or '#next-day' in url_format
+        by_month = '#month' in url_format or '#next-month' in url_format
+        by_year = '#year' in url_format or '#next-year' in url_format
+        curr_date = date_from
+        while curr_date <= date_until:
+            yield curr_date
+            if by_day:
+                curr_date += timedelta(days=1)
+            elif by_month:
+                curr_date = (curr_date.replace(day=1) + timedelta(days=32)).replace(day=1)
+            elif by_year:
+                curr_date = curr_date.replace(year=curr_date.year + 1, month=1, day=1)
+            else:  # There is only one URL
+                break
 
     @staticmethod
-    def _gen_url_from_date(curr_date, url_format):
+    def _gen_url_template(url_format):
+        """
+            Convert the #year #month #day and #next-year #next-month #next-day labels of url_format
+             to a str.format() template once, instead of replacing all labels for every day
+        """
+        url_template = url_format.replace('{', '{{').replace('}', '}}').\
+            replace('#year', '{curr_date.year:04d}').\
+            replace('#month', '{curr_date.month:02d}').\
+            replace('#day', '{curr_date.day:02d}'). \
+                                                   \
+            replace('#next-year', '{next_date.year:04d}'). \
+            replace('#next-month', '{next_date.month:02d}'). \
+            replace('#next-day', '{next_date.day:02d}')
+        return url_template
+
+    @staticmethod
+    def _gen_url_from_date(curr_date, url_format, url_template):
         """
             Generates the URLs of a page that contains URLs of articles published on that day.
             This function allows URLs to be grouped by years or month as there is no guarantee that all fields exists.
@@ -162,25 +273,25 @@ class NewsArchiveCrawler:
             next_date = curr_date + timedelta(days=365 + int(isleap(curr_date.year))
                                               - curr_date.timetuple().tm_yday + 1)
 
-        art_list_url = url_format.\
-            replace('#year', '{0:04d}'.format(curr_date.year)).\
-            replace('#month', '{0:02d}'.format(curr_date.month)).\
-            replace('#day', '{0:02d}'.format(curr_date.day)). \
-                                                              \
-            replace('#next-year', '{0:04d}'.format(next_date.year)). \
-            replace('#next-month', '{0:02d}'.format(next_date.month)). \
-            replace('#next-day', '{0:02d}'.format(next_date.day))
+        art_list_url = url_template.format(curr_date=curr_date, next_date=next_date)  # See _gen_url_template()
         return art_list_url
 
-    def _gen_article_urls_including_subpages(self, archive_page_url_base):
+    def _first_page_url(self, archive_page_url_base):
+        return archive_page_url_base.replace('#pagenum', self._initial_page_num)
+
+    def _gen_article_urls_including_subpages(self, archive_page_url_base, first_page_future=None):
         """
             Generates article URLs from a supplied URL including the on-demand sub-pages that contains article URLs
+             (the download of the first page may be already started in first_page_future)
         """
         page_num = self._min_pagenum
         first_page = True
-        next_page_url = archive_page_url_base.replace('#pagenum', self._initial_page_num)
+        next_page_url = self._first_page_url(archive_page_url_base)
         while next_page_url is not None:
-            archive_page_raw_html = self._downloader.download_url(next_page_url, self._ignore_archive_cache)
+            if first_page and first_page_future is not None:
+                archive_page_raw_html = first_page_future.result()
+            else:
+                archive_page_raw_html = self._downloader.download_url(next_page_url, self._ignore_archive_cache)
             curr_page_url = next_page_url
             if archive_page_raw_html is not None:  # Download succeeded
                 self._good_urls_add(next_page_url)
@@ -229,7 +340,7 @@ class NewsArchiveCrawler:
                      #  as the archive may have been moved
                      (art_url_threshold is not None and
                       (len(known_article_urls) == 0 or
-                       len(article_urls.minus(known_article_urls)) > art_url_threshold)))):
+                       sum(1 for url in article_urls if url not in known_article_urls) > art_url_threshold)))):
                 next_page_url = archive_page_url_base.replace('#pagenum', str(page_num))  # must generate URL
 
             return next_page_url
@@ -239,6 +350,7 @@ class NewsArchiveCrawler:
 class NewsArchiveDummyCrawler:
     def __init__(self, url_index_keys, *_, **__):
         self._url_index_keys = url_index_keys
+        self.bad_urls = set()  # Nothing is downloaded from the archive
 
     def url_iterator(self):
         return self._url_index_keys
@@ -261,14 +373,19 @@ class NewsArticleCrawler:
         # Initialise the logger
         self._logger = Logger(settings['log_file_articles'])
 
-        # Open files for writing gathered URLs if needed
-        self._new_urls = set()
+        # The set of the seen URLs is stored in the memory or in an LMDB database if url_sets_dir is set
+        url_sets_dir = settings.get('url_sets_dir')
+
+        # Every URL processed in this session either Article or Archive (good or problematic) for a single lookup
+        #  (the URLs are stored and looked up in canonical form to treat the different forms of the same URL as equal)
+        self._seen_urls = new_url_set(url_sets_dir, 'seen_urls')
+
+        # Open files for writing gathered URLs if needed (the good and problematic URLs are stored in the seen URLs)
         self._new_good_urls_fh, self._new_urls_add = \
-            add_and_write_factory(self._new_urls, settings.get('new_good_urls'))
+            add_and_write_factory(self._seen_urls, settings.get('new_good_urls'))
 
-        self.problematic_article_urls = set()
         self._new_problematic_urls_fh, self._problematic_article_urls_add = \
-            add_and_write_factory(self.problematic_article_urls, settings.get('new_problematic_urls'))
+            add_and_write_factory(self._seen_urls, settings.get('new_problematic_urls'))
 
         # Store values at init-time
         self._filter_by_date = settings['FILTER_ARTICLES_BY_DATE']
@@ -283,10 +400,19 @@ class NewsArticleCrawler:
         # Create new archive while downloading, or simulate download and read the archive
         self._downloader = WarcCachingDownloader(articles_existing_warc_filenames, articles_new_warc_filename,
                                                  self._logger, articles_just_cache, download_params)
+        # Download articles in parallel batches (the downloader uses a separate HTTP session in each worker thread,
+        #  but its rate limiting applies to all threads)
+        self._download_workers = settings.get('download_workers', 8)
+        self._pool = ThreadPoolExecutor(max_workers=self._download_workers)
 
         if known_article_urls is None:  # If None is supplied copy the ones from the article archive
             known_article_urls = self._downloader.url_index  # All URLs in the archive are known good!
 
+        # The archive is crawled while the articles are downloaded (see prefetch_iterator()):
+        #  the archive downloader shares the rate limit of the article downloader as they download from the same portal
+        if self._downloader.rate_limiter is not None:
+            download_params = dict(download_params or {}, rate_limiter=self._downloader.rate_limiter)
+
         if archive_just_cache and articles_just_cache:
             # Full offline mode for processing articles only without the archive
             self._archive_downloader = NewsArchiveDummyCrawler(self._downloader.url_index)
@@ -294,84 +420,111 @@ class NewsArticleCrawler:
             # For downloading the articles from a (possibly read-only) archive
             self._archive_downloader = NewsArchiveCrawler(settings, archive_existing_warc_filenames,
                                                           archive_new_warc_filename, archive_just_cache,
-                                                          known_article_urls, debug_params, download_params)
+                                                          known_article_urls, debug_params, download_params,
+                                                          self._seen_urls)
+
+        # Explicitly marked as bad URLs (either Article or Archive) are known at init-time, merge them for one lookup
+        #  (in canonical form as the seen URLs)
+        self._bad_urls = {canonical_url(url) for url in self._downloader.bad_urls | self._archive_downloader.bad_urls}
 
     def __del__(self):
+        if hasattr(self, '_pool'):
+            self._pool.shutdown()
+
         if hasattr(self, '_archive_downloader'):  # Make sure that the previous files are closed...
             del self._archive_downloader
 
-        if hasattr(self, '_new_good_urls_fh') and hasattr(self, 'close'):
+        if hasattr(self, '_new_good_urls_fh') and self._new_good_urls_fh is not None:
             self._new_good_urls_fh.close()
 
-        if hasattr(self, '_new_problematic_urls_fh') and hasattr(self, 'close'):
+        if hasattr(self, '_new_problematic_urls_fh') and self._new_problematic_urls_fh is not None:
             self._new_problematic_urls_fh.close()
 
-    def _is_problematic_url(self, url):
-        # Explicitly marked as bad URL (either Article or Archive) OR
-        # Download failed in this session and requires manual check (either Article or Archive)
-        return url in self._downloader.bad_urls or url in self._archive_downloader.bad_urls or \
-               url in self.problematic_article_urls or url in self._archive_downloader.problematic_urls
-
-    def _is_processed_good_url(self, url):
-        # New good URL newly downloaded (either Article or Archive)
-        # We do not count old good URLs (url_index) have taken from the cache WARC (either Article or Archive)
-        #  as they are needed to be copied to the target WARC!
-        return url in self._downloader.good_urls or url in self._archive_downloader.good_urls
-
     def download_and_extract_all_articles(self):
-        self.process_urls(self._archive_downloader.url_iterator())
+        # The archive is crawled in the background while the articles are downloaded
+        self.process_urls(prefetch_iterator(self._archive_downloader.url_iterator()))
 
     def process_urls(self, it):
+        """
+            Download and process the URLs of the iterator and the URLs to follow found in the downloaded articles.
+            The URLs to follow are collected in a worklist (urls) which is consumed before the iterator,
+             so there is no recursion however long the chains of followed URLs are
+        """
+        it = iter(it)
         urls = set()
-        for url in it:
-            urls.add(url)
-            while len(urls) > 0:
-                # This loop runs only one iteration if no URLs are extracted in step (6) else it consumes them first
+        batch = self._fill_batch(urls, it)
+        while len(batch) > 0:
+            # 2) "Download" articles in parallel (the results are processed one-by-one in the original order)
+            for url, article_raw_html in zip(batch, self._pool.map(self._downloader.download_url, batch)):
+                self._process_article(url, article_raw_html, urls)
+            batch = self._fill_batch(urls, it)
+
+    def _fill_batch(self, urls, it):
+        """
+            Collect the next batch of URLs to be downloaded in parallel.
+            The URLs extracted in step (6) are consumed first, then the batch is filled from the iterator
+        """
+        batch = []
+        batch_keys = set()
+        while len(batch) < self._download_workers:
+            if len(urls) > 0:
                 url = urls.pop()
-                # 1) Check if the URL is
-                # 1a) Explicitly marked as bad URL (either Article or Archive) -> Skip it, only INFO log!
-                if url in self._downloader.bad_urls or url in self._archive_downloader.bad_urls:
-                    self._logger.log('DEBUG', url, 'Skipping URLs explicitly marked as bad!', sep='\t')
-                    continue
-                # 1b) Download succeeded in this session either Article or Archive (duplicate)
-                # 1c) Download failed in this session and requires manual check either Article or Archive (duplicate)
-                elif self._is_processed_good_url(url) or \
-                        url in self.problematic_article_urls or url in self._archive_downloader.problematic_urls:
-                    self._logger.log('WARNING', url, 'Not processing URL, because it is an URL already'
-                                                     ' encountered in this session (including the caches)'
-                                                     ' or it is known to point to the portal\'s archive!', sep='\t')
-                    continue
-
-                # 2) "Download" article
-                article_raw_html = self._downloader.download_url(url)
-                if article_raw_html is None:  # Download failed, must be investigated!
-                    self._logger.log('ERROR', url, 'Article was not processed because download failed!', sep='\t')
-                    self._problematic_article_urls_add(url)  # New problematic URL for manual checking
-                    continue
-                self._new_urls_add(url)  # New article URLs
-
-                # 3) Identify the site scheme of the article to be able to look up the appropriate extracting method
-                scheme = self._converter.identify_site_scheme(url, article_raw_html)
-
-                # 4) Filter: time filtering when archive page URLs are not generated by date if needed
-                if self._filter_by_date:
-                    # a) Retrieve the date
-                    article_date = self._converter.extract_article_date(url, article_raw_html, scheme)
-                    if article_date is None:
-                        self._logger.log('ERROR', url, 'DATE COULD NOT BE PARSED!', sep='\t')
-                        continue
-                    # b) Check date interval
-                    elif not self._date_from <= article_date <= self._date_until:
-                        self._logger.log('WARNING', url, 'Date ({0}) is not in the specified interval: {1}-{2}'
-                                                         ' didn\'t use it in the corpus'.
-                                         format(article_date, self._date_from, self._date_until), sep='\t')
-                        continue
-
-                # 5) Extract text to corpus
-                self._converter.article_to_corpus(url, article_raw_html, scheme)
-
-                # 6) Extract links to other articles and check for already extracted urls (also in the archive)?
-                urls_to_follow = self._converter.follow_links_on_page(url, article_raw_html, scheme)
-                # Only add those which has not been already handled to avoid loops!
-                urls |= {url for url in urls_to_follow
-                         if not self._is_processed_good_url(url) and not self._is_problematic_url(url)}
+            else:
+                url = next(it, None)
+                if url is None:  # The iterator is exhausted
+                    break
+            # 1) Check if the URL (in any of its forms) is
+            key = canonical_url(url)
+            # 1a) Explicitly marked as bad URL (either Article or Archive) -> Skip it, only INFO log!
+            if key in self._bad_urls:
+                self._logger.log('DEBUG', url, 'Skipping URLs explicitly marked as bad!', sep='\t')
+                continue
+            # 1b) Download succeeded in this session either Article or Archive (duplicate)
+            # 1c) Download failed in this session and requires manual check either Article or Archive (duplicate)
+            #  (We do not count old good URLs (url_index) have taken from the cache WARC (either Article or Archive)
+            #   as they are needed to be copied to the target WARC!)
+            # 1d) Already in the current batch (duplicate)
+            elif key in self._seen_urls or key in batch_keys:
+                self._logger.log('WARNING', url, 'Not processing URL, because it is an URL already'
+                                                 ' encountered in this session (including the caches)'
+                                                 ' or it is known to point to the portal\'s archive!', sep='\t')
+                continue
+            batch.append(url)
+            batch_keys.add(key)
+        return batch
+
+    def _process_article(self, url, article_raw_html, urls):
+        if article_raw_html is None:  # Download failed, must be investigated!
+            self._logger.log('ERROR', url, 'Article was not processed because download failed!', sep='\t')
+            self._problematic_article_urls_add(url)  # New problematic URL for manual checking
+            return
+        self._new_urls_add(url)  # New article URLs
+
+        # 3) Identify the site scheme of the article to be able to look up the appropriate extracting method
+        scheme = self._converter.identify_site_scheme(url, article_raw_html)
+
+        # 4) Filter: time filtering when archive page URLs are not generated by date if needed
+        if self._filter_by_date:
+            # a) Retrieve the date
+            article_date = self._converter.extract_article_date(url, article_raw_html, scheme)
+            if article_date is None:
+                self._logger.log('ERROR', url, 'DATE COULD NOT BE PARSED!', sep='\t')
+                return
+            # b) Check date interval
+            elif not self._date_from <= article_date <= self._date_until:
+                self._logger.log('WARNING', url, 'Date ({0}) is not in the specified interval: {1}-{2}'
+                                                 ' didn\'t use it in the corpus'.
+                                 format(article_date, self._date_from, self._date_until), sep='\t')
+                return
+
+        # 5) Extract text to corpus
+        self._converter.article_to_corpus(url, article_raw_html, scheme)
+
+        # 6) Extract links to other articles and check for already extracted urls (also in the archive)?
+        urls_to_follow = self._converter.follow_links_on_page(url, article_raw_html, scheme)
+        # Only add those which has not been already handled to avoid loops!
+        # The bad URLs are a plain set: subtract them in one go and check only the remaining ones URL-by-URL
+        #  against the seen URLs (which store hashes only). Both are compared in canonical form.
+        urls_to_follow = {canonical_url(url): url for url in urls_to_follow}
+        urls.update(urls_to_follow[key] for key in urls_to_follow.keys() - self._bad_urls
+                    if key not in self._seen_urls)
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8, vim: expandtab:ts=4 -*-
+
+import os
+from array import array
+from bisect import bisect_left
+from threading import Lock
+from urllib.parse import urlsplit, urlunsplit, quote
+
+from xxhash import xxh64_intdigest
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+PATH_SAFE_CHARS = "/%:@!$&'()*+,;="  # Besides the unreserved characters, see RFC 3986
+QUERY_SAFE_CHARS = PATH_SAFE_CHARS + '?'
+
+
+def url_hash(url):
+    """64-bit hash of an URL (collisions are negligible for deduplication)"""
+    return xxh64_intdigest(url.encode('UTF-8'))
+
+
+def remove_dot_segments(path):
+    """Resolve the . and .. segments of an URL path (RFC 3986 Section 5.2.4)"""
+    segments = path.split('/')
+    out = []
+    for segment in segments:
+        if segment == '..':
+            if len(out) > 1:
+                out.pop()
+        elif segment != '.':
+            out.append(segment)
+    if segments[-1] in {'.', '..'}:  # Keep the trailing slash: /a/b/.. -> /a/
+        out.append('')
+    return '/'.join(out)
+
+
+def canonical_url(url):
+    """
+        The normalised form of an URL without the fragment to be able to compare the different forms of the same URL
+         (e.g. HTTP://Example.com:80/a/../b and http://example.com/b or the accented and the percent-encoded paths):
+         the scheme and the host are lowercased, the default port is removed, IDN hosts are converted to punycode,
+         the dot segments of the path are resolved and the path and the query are percent-encoded (as UTF-8)
+        Unparsable URLs are returned unchanged.
+    """
+    try:
+        scheme, netloc, path, query, _ = urlsplit(url)
+    except ValueError:
+        return url
+
+    scheme = scheme.lower()
+    userinfo, at, host = netloc.rpartition('@')
+    if ':' in host and not host.endswith(']'):  # IPv6 addresses are in brackets
+        host, colon, port = host.rpartition(':')
+    else:
+        colon, port = '', ''
+    if port in {'', DEFAULT_PORTS.get(scheme)}:
+        colon, port = '', ''
+    host = host.lower()
+    try:
+        host.encode('ASCII')
+    except UnicodeEncodeError:
+        try:
+            host = host.encode('idna').decode('ASCII')
+        except UnicodeError:  # e.g. too long labels
+            pass
+
+    path = quote(remove_dot_segments(path), safe=PATH_SAFE_CHARS)
+    if len(path) == 0 and len(host) > 0:
+        path = '/'
+    query = quote(query, safe=QUERY_SAFE_CHARS)
+    return urlunsplit((scheme, f'{userinfo}{at}{host}{colon}{port}', path, query, ''))
+
+
+def canonical_url_hash(url):
+    return url_hash(canonical_url(url))
+
+
+class UrlHashSet:
+    """
+        A set-like container for URLs which stores only the 64-bit hashes of the URLs to save memory
+         (an int instead of the whole string). Only adding and membership testing are supported,
+         the URLs can not be listed back (they are written to files when needed, see add_and_write_factory()).
+    """
+    def __init__(self, urls=()):
+        self._hashes = {url_hash(url) for url in urls}
+
+    def add(self, url):
+        self._hashes.add(url_hash(url))
+
+    def update(self, urls):
+        self._hashes.update(url_hash(url) for url in urls)
+
+    def __contains__(self, url):
+        return url_hash(url) in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+class FrozenUrlHashSet:
+    """
+        A read-only version of UrlHashSet for URL lists loaded once (e.g. known_article_urls): the hashes are stored
+         in a sorted array of 8-byte integers instead of a set (no per-element object and hash table overhead)
+         and membership is tested with binary search.
+    """
+    def __init__(self, urls=(), canonical=False):
+        self._hash = canonical_url_hash if canonical else url_hash
+        self._hashes = array('Q', sorted({self._hash(url) for url in urls}))
+
+    def __contains__(self, url):
+        h = self._hash(url)
+        i = bisect_left(self._hashes, h)
+        return i < len(self._hashes) and self._hashes[i] == h
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+class LmdbUrlHashSet:
+    """
+        The same as UrlHashSet, but the hashes are stored in an LMDB database (memory-mapped file) to keep huge sets
+         out of the memory. The database is emptied when opened as the set must contain only URLs from this session.
+        The additions are collected and written in batches of flush_every elements.
+    """
+    def __init__(self, db_dir, urls=(), map_size=1 << 34, flush_every=1000):
+        import lmdb  # Optional dependency, only needed if url_sets_dir is set
+
+        os.makedirs(db_dir, exist_ok=True)
+        # Durability is not needed, the database is emptied at the next start
+        self._env = lmdb.open(db_dir, map_size=map_size, sync=False, metasync=False)
+        with self._env.begin(write=True) as txn:
+            txn.drop(self._env.open_db(), delete=False)
+        self._lock = Lock()  # Adding and testing can happen in different threads
+        self._pending = set()
+        self._flush_every = flush_every
+        self.update(urls)
+
+    @staticmethod
+    def _key(url):
+        return url_hash(url).to_bytes(8, 'big')
+
+    def _flush(self):  # The lock must be held by the caller
+        with self._env.begin(write=True) as txn:
+            for key in self._pending:
+                txn.put(key, b'')
+        self._pending = set()
+
+    def add(self, url):
+        key = self._key(url)
+        with self._lock:
+            self._pending.add(key)
+            if len(self._pending) >= self._flush_every:
+                self._flush()
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url):
+        key = self._key(url)
+        with self._lock:
+            if key in self._pending:
+                return True
+            with self._env.begin() as txn:
+                return txn.get(key) is not None
+
+    def __len__(self):
+        with self._lock:
+            self._flush()
+            return self._env.stat()['entries']
+
+    def __del__(self):
+        if hasattr(self, '_env'):  # If the program opened a database, then it should gracefully close it on exit!
+            self._env.close()
+
+
+def new_url_set(url_sets_dir, name):
+    """Create an UrlHashSet in the memory or an LmdbUrlHashSet in url_sets_dir/name if url_sets_dir is set"""
+    if url_sets_dir is None:
+        return UrlHashSet()
+    return LmdbUrlHashSet(os.path.join(url_sets_dir, name))